@@ -22,7 +22,6 @@ if __name__ == '__main__':
 
     model = Generator(g_output_dim = mnist_dim).cuda()
     model = load_model(model, 'checkpoints')
-    model = torch.nn.DataParallel(model).cuda()
     model.eval()
 
     print('Model loaded.')
@@ -33,15 +32,16 @@ if __name__ == '__main__':
     os.makedirs('samples', exist_ok=True)
 
     n_samples = 0
-    with torch.no_grad():
+    with torch.inference_mode():
         while n_samples<10000:
-            z = torch.randn(args.batch_size, 100).cuda()
-            x = model(z)
-            x = x.reshape(args.batch_size, 28, 28)
+            batch_size = min(args.batch_size, 10000 - n_samples)
+            z = torch.randn(batch_size, 100, device='cuda')
+            with torch.autocast('cuda', dtype=torch.bfloat16, enabled=torch.cuda.is_bf16_supported()):
+                x = model(z)
+            x = x.float().reshape(batch_size, 28, 28).cpu()
             for k in range(x.shape[0]):
-                if n_samples<10000:
-                    torchvision.utils.save_image(x[k:k+1], os.path.join('samples', f'{n_samples}.png'))         
-                    n_samples += 1
+                torchvision.utils.save_image(x[k:k+1], os.path.join('samples', f'{n_samples}.png'))         
+                n_samples += 1
 
 
     
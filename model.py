@@ -31,4 +31,4 @@ class Discriminator(nn.Module):
         x = F.leaky_relu(self.fc1(x), 0.2)
         x = F.leaky_relu(self.fc2(x), 0.2)
         x = F.leaky_relu(self.fc3(x), 0.2)
-        return torch.sigmoid(self.fc4(x))
+        return self.fc4(x)
@@ -1,14 +1,16 @@
 import torch 
 import os
+import sys
 from tqdm import trange
 import argparse
 from torchvision import datasets, transforms
 import torch.nn as nn
 import torch.optim as optim
+from torch.profiler import profile, schedule, tensorboard_trace_handler, ProfilerActivity
 
 
 from model import Generator, Discriminator
-from utils import D_train, G_train, save_models
+from utils import D_train, G_train, save_models, dump_memory_snapshot
 
 
 
@@ -21,9 +23,15 @@ if __name__ == '__main__':
                       help="The learning rate to use for training.")
     parser.add_argument("--batch_size", type=int, default=64, 
                         help="Size of mini-batches for SGD")
+    parser.add_argument("--profile", action='store_true',
+                        help="Profile a few training steps to ./log and exit.")
+    parser.add_argument("--memory_snapshot", action='store_true',
+                        help="Record CUDA allocations and dump them to mem.pickle at each checkpoint.")
 
     args = parser.parse_args()
 
+    torch.backends.cuda.matmul.allow_tf32 = True
+
 
     os.makedirs('chekpoints', exist_ok=True)
     os.makedirs('data', exist_ok=True)
@@ -40,7 +48,9 @@ if __name__ == '__main__':
 
 
     train_loader = torch.utils.data.DataLoader(dataset=train_dataset, 
-                                               batch_size=args.batch_size, shuffle=True)
+                                               batch_size=args.batch_size, shuffle=True,
+                                               num_workers=4, pin_memory=True,
+                                               persistent_workers=True, prefetch_factor=4)
     test_loader = torch.utils.data.DataLoader(dataset=test_dataset, 
                                               batch_size=args.batch_size, shuffle=False)
     print('Dataset Loaded.')
@@ -59,23 +69,50 @@ if __name__ == '__main__':
 
 
     # define loss
-    criterion = nn.BCELoss() 
+    criterion = nn.BCEWithLogitsLoss()
 
     # define optimizers
-    G_optimizer = optim.Adam(G.parameters(), lr = args.lr)
-    D_optimizer = optim.Adam(D.parameters(), lr = args.lr)
+    G_optimizer = optim.Adam(G.parameters(), lr = args.lr, fused=True)
+    D_optimizer = optim.Adam(D.parameters(), lr = args.lr, fused=True)
+
+    if args.profile:
+        print('Start Profiling :')
+        with profile(activities=[ProfilerActivity.CPU, ProfilerActivity.CUDA],
+                     schedule=schedule(wait=1, warmup=1, active=3),
+                     on_trace_ready=tensorboard_trace_handler('./log'),
+                     record_shapes=True, profile_memory=True) as prof:
+            for batch_idx, (x, _) in enumerate(train_loader):
+                if batch_idx == 5:
+                    break
+                x = x.view(-1, mnist_dim)
+                D_train(x, G, D, D_optimizer, criterion)
+                G_train(x, G, D, G_optimizer, criterion)
+                prof.step()
+        print('Profiling done')
+        sys.exit(0)
+
+    if args.memory_snapshot:
+        torch.cuda.memory._record_memory_history(True, trace_alloc_max_entries=100000,
+                                                 trace_alloc_record_context=True)
 
     print('Start Training :')
     
     n_epoch = args.epochs
-    for epoch in trange(1, n_epoch+1, leave=True):           
-        for batch_idx, (x, _) in enumerate(train_loader):
-            x = x.view(-1, mnist_dim)
-            D_train(x, G, D, D_optimizer, criterion)
-            G_train(x, G, D, G_optimizer, criterion)
-
-        if epoch % 10 == 0:
-            save_models(G, D, 'checkpoints')
+    try:
+        for epoch in trange(1, n_epoch+1, leave=True):           
+            for batch_idx, (x, _) in enumerate(train_loader):
+                x = x.view(-1, mnist_dim)
+                D_train(x, G, D, D_optimizer, criterion)
+                G_train(x, G, D, G_optimizer, criterion)
+
+            if epoch % 10 == 0:
+                save_models(G, D, 'checkpoints')
+                if args.memory_snapshot:
+                    dump_memory_snapshot('mem.pickle')
+    except torch.cuda.OutOfMemoryError:
+        if args.memory_snapshot:
+            dump_memory_snapshot('mem.pickle')
+        raise
                 
     print('Training done')
 
@@ -1,5 +1,6 @@
 import torch
 import os
+import pickle
 
 
 
@@ -8,36 +9,35 @@ def D_train(x, G, D, D_optimizer, criterion):
     D.zero_grad()
 
     # train discriminator on real
-    x_real, y_real = x, torch.ones(x.shape[0], 1)
-    x_real, y_real = x_real.cuda(), y_real.cuda()
+    x_real, y_real = x.cuda(non_blocking=True), torch.ones(x.shape[0], 1, device='cuda')
 
     D_output = D(x_real)
     D_real_loss = criterion(D_output, y_real)
-    D_real_score = D_output
 
     # train discriminator on facke
-    z = torch.randn(x.shape[0], 100).cuda()
-    x_fake, y_fake = G(z), torch.zeros(x.shape[0], 1).cuda()
+    z = torch.randn(x.shape[0], 100, device='cuda')
+    with torch.no_grad():
+        x_fake = G(z)
+    y_fake = torch.zeros(x.shape[0], 1, device='cuda')
 
     D_output =  D(x_fake)
     
     D_fake_loss = criterion(D_output, y_fake)
-    D_fake_score = D_output
 
     # gradient backprop & optimize ONLY D's parameters
     D_loss = D_real_loss + D_fake_loss
     D_loss.backward()
     D_optimizer.step()
         
-    return  D_loss.data.item()
+    return  D_loss.detach()
 
 
 def G_train(x, G, D, G_optimizer, criterion):
     #=======================Train the generator=======================#
     G.zero_grad()
 
-    z = torch.randn(x.shape[0], 100).cuda()
-    y = torch.ones(x.shape[0], 1).cuda()
+    z = torch.randn(x.shape[0], 100, device='cuda')
+    y = torch.ones(x.shape[0], 1, device='cuda')
                  
     G_output = G(z)
     D_output = D(G_output)
@@ -47,7 +47,7 @@ def G_train(x, G, D, G_optimizer, criterion):
     G_loss.backward()
     G_optimizer.step()
         
-    return G_loss.data.item()
+    return G_loss.detach()
 
 
 
@@ -56,6 +56,11 @@ def save_models(G, D, folder):
     torch.save(D.state_dict(), os.path.join(folder,'D.pth'))
 
 
+def dump_memory_snapshot(path):
+    with open(path, 'wb') as f:
+        pickle.dump(torch.cuda.memory._snapshot(), f)
+
+
 def load_model(G, folder):
     ckpt = torch.load(os.path.join(folder,'G.pth'))
     G.load_state_dict({k.replace('module.', ''): v for k, v in ckpt.items()})